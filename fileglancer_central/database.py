@@ -283,11 +283,11 @@ def get_last_refresh(session, table_name: str):
 
 def get_user_preference(session: Session, username: str, key: str) -> Optional[Dict]:
     """Get a user preference value by username and key"""
-    pref = session.query(UserPreferenceDB).filter_by(
+    # Only the value is needed, so skip building an ORM object
+    return session.query(UserPreferenceDB.value).filter_by(
         username=username,
         key=key
-    ).first()
-    return pref.value if pref else None
+    ).scalar()
 
 
 def set_user_preference(session: Session, username: str, key: str, value: Dict):
@@ -327,8 +327,8 @@ def delete_user_preference(session: Session, username: str, key: str) -> bool:
 
 def get_all_user_preferences(session: Session, username: str) -> Dict[str, Dict]:
     """Get all preferences for a user"""
-    prefs = session.query(UserPreferenceDB).filter_by(username=username).all()
-    return {pref.key: pref.value for pref in prefs}
+    prefs = session.query(UserPreferenceDB.key, UserPreferenceDB.value).filter_by(username=username)
+    return dict(prefs.all())
 
 
 def get_proxied_paths(session: Session, username: str, fsp_name: str = None, path: str = None) -> List[ProxiedPathDB]:
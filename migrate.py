@@ -7,50 +7,73 @@ command line connection strings. It leverages Alembic for schema management and
 focuses on data migration with comprehensive error handling and progress reporting.
 """
 
+from __future__ import annotations
+
 import argparse
+import csv
+import io
 import os
+import queue
 import sqlite3
 import sys
 import logging
-import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, UTC
 from typing import Optional, Dict, List, Any
 
-# Check for required dependencies
-try:
-    from alembic.config import Config
-    from alembic import command
-    ALEMBIC_AVAILABLE = True
-except ImportError:
-    print("⚠️  Warning: Alembic not available. Please install with: pip install alembic")
-    ALEMBIC_AVAILABLE = False
-
-try:
-    import sqlalchemy
-    from sqlalchemy import create_engine, text, inspect, MetaData
-    from sqlalchemy.orm import sessionmaker
-    SQLALCHEMY_AVAILABLE = True
-except ImportError:
-    print("❌ Error: SQLAlchemy is required. Please install with: pip install sqlalchemy")
-    sys.exit(1)
-
-try:
-    import psycopg2
-    POSTGRESQL_DRIVER = 'psycopg2'
-except ImportError:
+# Heavy dependencies are imported by load_dependencies() once the command line
+# has been parsed, so --help stays fast and works without them installed
+ALEMBIC_AVAILABLE = False
+POSTGRESQL_DRIVER = None
+
+
+def load_dependencies():
+    """Import Alembic, SQLAlchemy and the PostgreSQL driver into module scope."""
+    global Config, command, ALEMBIC_AVAILABLE
+    global sqlalchemy, create_engine, event, text, inspect, MetaData
+    global execute_batch, POSTGRESQL_DRIVER
+
+    try:
+        from alembic.config import Config
+        from alembic import command
+        ALEMBIC_AVAILABLE = True
+    except ImportError:
+        print("⚠️  Warning: Alembic not available. Please install with: pip install alembic")
+        ALEMBIC_AVAILABLE = False
+
     try:
-        import asyncpg
-        POSTGRESQL_DRIVER = 'asyncpg'
+        import sqlalchemy
+        from sqlalchemy import create_engine, event, text, inspect, MetaData
     except ImportError:
-        print("❌ Error: PostgreSQL driver required. Please install with: pip install psycopg2-binary")
+        print("❌ Error: SQLAlchemy is required. Please install with: pip install sqlalchemy")
         sys.exit(1)
 
+    # The loader uses psycopg2's COPY and execute_batch support, so no other driver will do
+    try:
+        from psycopg2.extras import execute_batch
+        POSTGRESQL_DRIVER = 'psycopg2'
+    except ImportError:
+        print("❌ Error: psycopg2 is required. Please install with: pip install psycopg2-binary")
+        sys.exit(1)
+
+
+# Names of the foreign server and staging schema used by --use-fdw
+FDW_SERVER = 'migrate_sqlite_src'
+FDW_SCHEMA = 'migrate_sqlite_stage'
+
+# maintenance_work_mem used while recreating indexes after the load
+INDEX_BUILD_MEMORY = '1GB'
+
+# Number of rows between progress messages while loading a table
+PROGRESS_LOG_INTERVAL = 100000
+
 
 def setup_logging(verbose: bool = False) -> logging.Logger:
     """Setup logging configuration."""
     level = logging.DEBUG if verbose else logging.INFO
 
-    # Configure logging with forced flushing
+    # Configure logging
     logging.basicConfig(
         level=level,
         format='%(asctime)s - %(levelname)s - %(message)s',
@@ -65,39 +88,12 @@ def setup_logging(verbose: bool = False) -> logging.Logger:
         logging.getLogger('sqlalchemy.pool').setLevel(logging.WARNING)
         logging.getLogger('sqlalchemy.orm').setLevel(logging.WARNING)
 
-    # Force unbuffered output
-    import sys
+    # Line-buffer stdout so report output appears immediately; log records go to
+    # stderr through the StreamHandler, which flushes after every record
     sys.stdout.reconfigure(line_buffering=True)
 
     logger = logging.getLogger(__name__)
 
-    # Add explicit flush after each log message
-    original_info = logger.info
-    original_warning = logger.warning
-    original_error = logger.error
-    original_debug = logger.debug
-
-    def info_with_flush(msg, *args, **kwargs):
-        original_info(msg, *args, **kwargs)
-        sys.stdout.flush()
-
-    def warning_with_flush(msg, *args, **kwargs):
-        original_warning(msg, *args, **kwargs)
-        sys.stdout.flush()
-
-    def error_with_flush(msg, *args, **kwargs):
-        original_error(msg, *args, **kwargs)
-        sys.stdout.flush()
-
-    def debug_with_flush(msg, *args, **kwargs):
-        original_debug(msg, *args, **kwargs)
-        sys.stdout.flush()
-
-    logger.info = info_with_flush
-    logger.warning = warning_with_flush
-    logger.error = error_with_flush
-    logger.debug = debug_with_flush
-
     return logger
 
 
@@ -116,7 +112,12 @@ Examples:
     --alembic-config /path/to/alembic.ini --alembic-script-location /path/to/alembic/versions
 
 Optional flags:
-  --batch-size 1000           # Control memory usage for large datasets
+  --batch-size 10000          # Rows fetched from SQLite per read
+  --copy-chunk-size 50000     # Rows sent to PostgreSQL per COPY
+  --commit-size 100000       # Commit every N rows instead of once per table
+  --unlogged                 # Load into UNLOGGED tables, then set them LOGGED
+  --use-fdw                  # Copy server-side through the sqlite_fdw extension
+  --workers 8                # Number of tables migrated concurrently
   --verbose                  # Enable detailed logging
   --yes, -y                  # Automatically answer yes to all prompts
   --alembic-config PATH      # Custom alembic.ini file path
@@ -139,8 +140,42 @@ Optional flags:
     parser.add_argument(
         '--batch-size',
         type=int,
-        default=1000,
-        help='Batch size for data migration (default: 1000)'
+        default=10000,
+        help='Number of rows fetched from SQLite per read (default: 10000)'
+    )
+
+    parser.add_argument(
+        '--copy-chunk-size',
+        type=int,
+        default=50000,
+        help='Number of rows sent to PostgreSQL per COPY (default: 50000)'
+    )
+
+    parser.add_argument(
+        '--commit-size',
+        type=int,
+        help='Commit after every N rows loaded into a table, rounded up to whole COPY chunks '
+             '(default: one transaction per table)'
+    )
+
+    parser.add_argument(
+        '--unlogged',
+        action='store_true',
+        help='Load data into UNLOGGED tables to skip WAL writes, then set them back to LOGGED'
+    )
+
+    parser.add_argument(
+        '--use-fdw',
+        action='store_true',
+        help='Copy data inside PostgreSQL through the sqlite_fdw extension; the SQLite file must be '
+             'readable by the PostgreSQL server. Falls back to the client-side copy if unavailable'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Number of tables migrated concurrently (default: 8)'
     )
 
     parser.add_argument(
@@ -168,6 +203,21 @@ Optional flags:
     return parser.parse_args()
 
 
+def tune_sqlite_engine(sqlite_engine):
+    """Apply read-oriented PRAGMAs to every connection the SQLite engine opens."""
+    if sqlite_engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(sqlite_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # Only per-connection settings; the source file itself is never modified
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA cache_size = -262144")  # 256 MiB page cache
+        cursor.execute("PRAGMA mmap_size = 1073741824")  # Memory-map up to 1 GiB of the file
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.close()
+
+
 def validate_sqlite_connection(sqlite_engine, logger: logging.Logger) -> bool:
     """Validate SQLite database connection."""
     try:
@@ -285,6 +335,10 @@ def check_existing_postgresql_schema(postgresql_engine, logger: logging.Logger,
                     if auto_yes:
                         logger.info("🤖 Auto-confirming deletion of existing data (--yes flag used)")
                         return True
+                    # Don't wait for an answer that can never come when run from cron, CI or nohup
+                    if not sys.stdin.isatty():
+                        logger.error("❌ Cannot confirm deletion of existing data without a terminal; use --yes to proceed")
+                        return False
                     response = input("Continue with deletion of existing data? (y/N): ")
                     return response.lower() in ['y', 'yes']
 
@@ -305,6 +359,8 @@ def clear_postgresql_database(postgresql_engine, logger: logging.Logger) -> bool
             trans = conn.begin()
 
             try:
+                quote = postgresql_engine.dialect.identifier_preparer.quote
+
                 # Get all table names first
                 inspector = inspect(postgresql_engine)
                 table_names = inspector.get_table_names()
@@ -312,13 +368,9 @@ def clear_postgresql_database(postgresql_engine, logger: logging.Logger) -> bool
                 if table_names:
                     logger.info(f"  📋 Found {len(table_names)} tables to drop: {table_names}")
 
-                    # Drop all tables with CASCADE to handle foreign key constraints
-                    for table_name in table_names:
-                        try:
-                            conn.execute(text(f"DROP TABLE IF EXISTS {table_name} CASCADE"))
-                            logger.info(f"    🗑️  Dropped table: {table_name}")
-                        except Exception as e:
-                            logger.warning(f"    ⚠️  Failed to drop table {table_name}: {e}")
+                    # Drop all tables in one statement with CASCADE to handle foreign key constraints
+                    conn.execute(text(f"DROP TABLE IF EXISTS {', '.join(quote(t) for t in table_names)} CASCADE"))
+                    logger.info(f"    🗑️  Dropped {len(table_names)} tables")
                 else:
                     logger.info("  📋 No tables found to drop")
 
@@ -329,12 +381,9 @@ def clear_postgresql_database(postgresql_engine, logger: logging.Logger) -> bool
                 ))
                 sequences = [row[0] for row in sequences_result.fetchall()]
 
-                for sequence_name in sequences:
-                    try:
-                        conn.execute(text(f"DROP SEQUENCE IF EXISTS {sequence_name} CASCADE"))
-                        logger.info(f"    🗑️  Dropped sequence: {sequence_name}")
-                    except Exception as e:
-                        logger.warning(f"    ⚠️  Failed to drop sequence {sequence_name}: {e}")
+                if sequences:
+                    conn.execute(text(f"DROP SEQUENCE IF EXISTS {', '.join(quote(s) for s in sequences)} CASCADE"))
+                    logger.info(f"    🗑️  Dropped sequences: {sequences}")
 
                 # Drop all custom types
                 logger.info("  🔄 Dropping all custom types...")
@@ -343,12 +392,9 @@ def clear_postgresql_database(postgresql_engine, logger: logging.Logger) -> bool
                 ))
                 types = [row[0] for row in types_result.fetchall()]
 
-                for type_name in types:
-                    try:
-                        conn.execute(text(f"DROP TYPE IF EXISTS {type_name} CASCADE"))
-                        logger.info(f"    🗑️  Dropped type: {type_name}")
-                    except Exception as e:
-                        logger.warning(f"    ⚠️  Failed to drop type {type_name}: {e}")
+                if types:
+                    conn.execute(text(f"DROP TYPE IF EXISTS {', '.join(quote(t) for t in types)} CASCADE"))
+                    logger.info(f"    🗑️  Dropped types: {types}")
 
                 # Commit the transaction
                 trans.commit()
@@ -364,22 +410,20 @@ def clear_postgresql_database(postgresql_engine, logger: logging.Logger) -> bool
         return False
 
 
-def verify_schema_creation(postgresql_engine, logger: logging.Logger) -> bool:
+def verify_schema_creation(postgresql_engine, postgresql_metadata: MetaData, logger: logging.Logger) -> bool:
     """Verify that Alembic migrations created the expected schema."""
     try:
-        inspector = inspect(postgresql_engine)
-        tables = inspector.get_table_names()
+        tables = set(postgresql_metadata.tables)
 
         # Filter out system tables
-        user_tables = [t for t in tables if not t.startswith('pg_') and t != 'information_schema']
+        user_tables = [t for t in postgresql_metadata.tables.values() if not t.name.startswith('pg_') and t.name != 'information_schema']
 
         logger.info(f"📊 Found {len(user_tables)} tables after Alembic migration:")
         for table in user_tables:
-            columns = inspector.get_columns(table)
-            logger.info(f"  📋 {table}: {len(columns)} columns")
-            if logger.level <= logging.DEBUG:
-                for col in columns:
-                    logger.debug(f"    - {col['name']}: {col['type']}")
+            logger.info(f"  📋 {table.name}: {len(table.columns)} columns")
+            if logger.isEnabledFor(logging.DEBUG):
+                for col in table.columns:
+                    logger.debug(f"    - {col.name}: {col.type}")
 
         if len(user_tables) == 0:
             logger.error("❌ No tables found after Alembic migration!")
@@ -413,6 +457,15 @@ def apply_alembic_migrations(alembic_cfg: Config, postgresql_url: str, logger: l
     original_migration_url = os.environ.get('FILEGLANCER_MIGRATION_DB_URL')
     os.environ['FILEGLANCER_MIGRATION_DB_URL'] = postgresql_url
 
+    # env.py reconfigures logging from alembic.ini, so remember the current setup to put it back afterwards
+    saved_handlers = logging.root.handlers[:]
+    saved_level = logging.root.level
+    saved_loggers = {
+        name: (existing.level, existing.disabled)
+        for name, existing in logging.Logger.manager.loggerDict.items()
+        if isinstance(existing, logging.Logger)
+    }
+
     try:
         logger.info("🔄 Running Alembic upgrade to head...")
         logger.info(f"🔧 Set FILEGLANCER_MIGRATION_DB_URL to: {postgresql_url.split('@')[0]}@***")
@@ -438,12 +491,22 @@ def apply_alembic_migrations(alembic_cfg: Config, postgresql_url: str, logger: l
         else:
             os.environ.pop('FILEGLANCER_MIGRATION_DB_URL', None)
 
+        # Restore the logging setup replaced by Alembic
+        for handler in logging.root.handlers:
+            if handler not in saved_handlers:
+                handler.close()
+        logging.root.handlers[:] = saved_handlers
+        logging.root.setLevel(saved_level)
+        for name, (level, disabled) in saved_loggers.items():
+            existing = logging.getLogger(name)
+            existing.setLevel(level)
+            existing.disabled = disabled
 
-def get_table_dependencies(sqlite_engine, logger: logging.Logger) -> List[str]:
+
+def get_table_dependencies(sqlite_metadata: MetaData, logger: logging.Logger) -> List[str]:
     """Get tables sorted by dependency order (parent tables first)."""
     try:
-        inspector = inspect(sqlite_engine)
-        all_tables = inspector.get_table_names()
+        all_tables = [table.name for table in sqlite_metadata.sorted_tables]
 
         # Filter out system tables
         user_tables = [table for table in all_tables if not table.startswith('sqlite_')]
@@ -465,208 +528,478 @@ def get_table_dependencies(sqlite_engine, logger: logging.Logger) -> List[str]:
         return []
 
 
-def disable_postgresql_constraints(postgresql_engine, logger: logging.Logger):
-    """Temporarily disable PostgreSQL constraints for faster inserts."""
+def disable_postgresql_constraints(postgresql_engine, logger: logging.Logger) -> bool:
+    """Check whether constraint checks and triggers can be disabled for the load transactions."""
     try:
         with postgresql_engine.connect() as conn:
-            # Disable foreign key checks temporarily (requires SUPERUSER privileges)
-            conn.execute(text("SET session_replication_role = replica;"))
-            conn.commit()
-        logger.info("🔧 PostgreSQL constraints temporarily disabled")
+            # Disabling foreign key checks requires SUPERUSER privileges; SET LOCAL only lasts
+            # until the rollback, so this leaves the pooled connection unchanged
+            conn.execute(text("SET LOCAL session_replication_role = replica"))
+            conn.rollback()
+        logger.info("🔧 PostgreSQL constraints will be disabled while loading")
+        return True
 
     except Exception as e:
         # This is expected if user doesn't have SUPERUSER privileges
         logger.info(f"💡 Constraint optimization not available (requires SUPERUSER): {type(e).__name__}")
         logger.info("🔧 Migration will proceed without constraint optimization")
+        return False
+
+
+def configure_load_transaction(conn, disable_constraints: bool):
+    """Apply session settings for bulk loading to the current transaction only."""
+    # The migration can simply be re-run, so don't wait for WAL flushes on commit
+    conn.execute(text("SET LOCAL synchronous_commit = off"))
+    if disable_constraints:
+        # Skip foreign key checks and triggers for the rows loaded in this transaction
+        conn.execute(text("SET LOCAL session_replication_role = replica"))
+
+
+def copy_rows_to_postgresql(cursor, table_name: str, column_list: str, rows) -> None:
+    """Load rows into a PostgreSQL table with a single COPY FROM STDIN."""
+    buffer = io.StringIO()
+    # QUOTE_NOTNULL leaves None unquoted so COPY reads it as NULL, while empty strings stay ""
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL, lineterminator='\n')
+    writer.writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table_name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
 
 
-def enable_postgresql_constraints(postgresql_engine, logger: logging.Logger):
-    """Re-enable PostgreSQL constraints after migration."""
+def prepare_insert_statement(cursor, statement_name: str, table_name: str, column_list: str, column_count: int) -> None:
+    """Prepare a server-side INSERT statement so it is parsed and planned only once per table."""
+    placeholders = ', '.join(f"${i}" for i in range(1, column_count + 1))
+    cursor.execute(f"PREPARE {statement_name} AS INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})")
+
+
+def insert_rows_to_postgresql(cursor, statement_name: str, column_count: int, rows, page_size: int) -> None:
+    """Insert rows through a prepared INSERT statement, sending page_size executions per round-trip."""
+    placeholders = ', '.join(['%s'] * column_count)
+    execute_batch(cursor, f"EXECUTE {statement_name} ({placeholders})", rows, page_size=page_size)
+
+
+def drop_postgresql_indexes(postgresql_engine, table_names: List[str], logger: logging.Logger) -> List[str]:
+    """Drop secondary indexes on the given tables and return their definitions for restoring later."""
     try:
-        with postgresql_engine.connect() as conn:
-            # Re-enable foreign key checks
-            conn.execute(text("SET session_replication_role = DEFAULT;"))
-            conn.commit()
-        logger.info("🔧 PostgreSQL constraints re-enabled")
+        with postgresql_engine.begin() as conn:
+            # Keep indexes that back constraints (primary keys, unique constraints) and
+            # unique indexes, since those still enforce data rules during the load
+            indexes = conn.execute(text("""
+                SELECT i.relname AS indexname, pg_get_indexdef(ix.indexrelid) AS indexdef
+                FROM pg_index ix
+                JOIN pg_class i ON i.oid = ix.indexrelid
+                JOIN pg_class t ON t.oid = ix.indrelid
+                JOIN pg_namespace n ON n.oid = t.relnamespace
+                WHERE n.nspname = 'public'
+                AND t.relname = ANY(:table_names)
+                AND NOT ix.indisunique
+                AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = ix.indexrelid)
+            """), {"table_names": table_names}).fetchall()
+
+            if not indexes:
+                return []
+
+            quote = postgresql_engine.dialect.identifier_preparer.quote
+            conn.execute(text(f"DROP INDEX {', '.join(quote(index.indexname) for index in indexes)}"))
+
+        logger.info(f"🔧 Dropped {len(indexes)} indexes for faster loading: {[index.indexname for index in indexes]}")
+        return [index.indexdef for index in indexes]
+
+    except Exception as e:
+        logger.warning(f"⚠️  Could not drop indexes, loading with indexes in place: {e}")
+        return []
+
+
+def restore_postgresql_indexes(postgresql_engine, index_definitions: List[str], logger: logging.Logger) -> bool:
+    """Recreate indexes previously dropped by drop_postgresql_indexes."""
+    if not index_definitions:
+        return True
+
+    try:
+        with postgresql_engine.begin() as conn:
+            # Give the index builds more memory so they can sort in memory rather than on disk
+            conn.execute(text(f"SET LOCAL maintenance_work_mem = '{INDEX_BUILD_MEMORY}'"))
+            for index_definition in index_definitions:
+                conn.execute(text(index_definition))
+        logger.info(f"🔧 Recreated {len(index_definitions)} indexes")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Failed to recreate indexes: {e}")
+        for index_definition in index_definitions:
+            logger.error(f"    {index_definition};")
+        return False
+
+
+def set_postgresql_tables_logged(postgresql_engine, table_names: List[str], logged: bool,
+                                 logger: logging.Logger) -> bool:
+    """Switch PostgreSQL tables between LOGGED and UNLOGGED persistence."""
+    persistence = "LOGGED" if logged else "UNLOGGED"
+    quote = postgresql_engine.dialect.identifier_preparer.quote
+    try:
+        with postgresql_engine.begin() as conn:
+            for table_name in table_names:
+                conn.execute(text(f"ALTER TABLE {quote(table_name)} SET {persistence}"))
+        logger.info(f"🔧 Set {len(table_names)} PostgreSQL tables to {persistence}")
+        return True
 
     except Exception as e:
-        # This is expected if user doesn't have SUPERUSER privileges or constraints weren't disabled
-        logger.debug(f"Constraint re-enable not needed or not available: {type(e).__name__}")
+        if logged:
+            logger.error(f"❌ Failed to set tables back to LOGGED, run ALTER TABLE ... SET LOGGED manually: {e}")
+        else:
+            logger.warning(f"⚠️  Could not set tables to UNLOGGED, loading with WAL enabled: {e}")
+        return False
+
+
+def fetch_batches(cursor, batch_size: int):
+    """Yield lists of up to batch_size rows from a DB-API cursor until it is exhausted."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def chunk_rows(partitions, chunk_size: int):
+    """Regroup streamed row partitions into chunks of at least chunk_size rows."""
+    chunk = []
+    for partition in partitions:
+        chunk.extend(partition)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def prefetch(iterable, depth: int = 1):
+    """Iterate in a background thread, keeping up to depth items ready ahead of the consumer."""
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
 
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(e)
+        put(done)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
 
-def migrate_table_data(sqlite_engine, postgresql_engine, table_name: str, batch_size: int, logger: logging.Logger) -> int:
+
+def get_insert_columns(sqlite_table, postgresql_table) -> List[str]:
+    """Get the columns to migrate: those present in both databases, excluding the auto-generated ID."""
+    postgresql_col_names = set(postgresql_table.columns.keys())
+    common_columns = [col for col in sqlite_table.columns.keys() if col in postgresql_col_names]
+    insert_columns = [col for col in common_columns if col.lower() != 'id']
+    return insert_columns or common_columns  # Fallback if no non-ID columns
+
+
+def setup_sqlite_fdw(postgresql_engine, sqlite_path: Optional[str], logger: logging.Logger) -> Optional[str]:
+    """Expose the SQLite database inside PostgreSQL through sqlite_fdw and return the staging schema name."""
+    try:
+        # In-memory databases (e.g. a bare sqlite:// URL) have no file PostgreSQL could open
+        if not sqlite_path or sqlite_path == ':memory:':
+            raise ValueError("the SQLite database is not a file")
+        sqlite_path = os.path.abspath(sqlite_path)
+
+        with postgresql_engine.begin() as conn:
+            # DDL cannot take bind parameters, so quote the path as a string literal
+            database_option = "'" + sqlite_path.replace("'", "''") + "'"
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS sqlite_fdw"))
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {FDW_SCHEMA} CASCADE"))
+            conn.execute(text(f"DROP SERVER IF EXISTS {FDW_SERVER} CASCADE"))
+            conn.execute(text(f"CREATE SERVER {FDW_SERVER} FOREIGN DATA WRAPPER sqlite_fdw OPTIONS (database {database_option})"))
+            conn.execute(text(f"CREATE SCHEMA {FDW_SCHEMA}"))
+            conn.execute(text(f"IMPORT FOREIGN SCHEMA public FROM SERVER {FDW_SERVER} INTO {FDW_SCHEMA}"))
+        logger.info(f"🔧 SQLite database attached to PostgreSQL through sqlite_fdw: {sqlite_path}")
+        return FDW_SCHEMA
+
+    except Exception as e:
+        logger.warning(f"⚠️  sqlite_fdw not available, copying data through this script instead: {e}")
+        return None
+
+
+def teardown_sqlite_fdw(postgresql_engine, logger: logging.Logger):
+    """Remove the staging schema and foreign server created by setup_sqlite_fdw."""
+    try:
+        with postgresql_engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {FDW_SCHEMA} CASCADE"))
+            conn.execute(text(f"DROP SERVER IF EXISTS {FDW_SERVER} CASCADE"))
+        logger.info("🔧 sqlite_fdw staging schema removed")
+
+    except Exception as e:
+        logger.warning(f"⚠️  Could not remove sqlite_fdw staging schema {FDW_SCHEMA}: {e}")
+
+
+def migrate_table_data_with_fdw(postgresql_engine, sqlite_metadata: MetaData, postgresql_metadata: MetaData,
+                                fdw_schema: str, table_name: str, disable_constraints: bool,
+                                logger: logging.Logger) -> int:
+    """Migrate data for a specific table with a server-side INSERT ... SELECT from the sqlite_fdw schema."""
+    sqlite_table = sqlite_metadata.tables.get(table_name)
+    postgresql_table = postgresql_metadata.tables.get(table_name)
+
+    if sqlite_table is None or postgresql_table is None:
+        logger.warning(f"⚠️  Table {table_name} not found in both databases")
+        return 0
+
+    insert_columns = get_insert_columns(sqlite_table, postgresql_table)
+    if not insert_columns:
+        logger.warning(f"⚠️  No common columns found for table {table_name}")
+        return 0
+
+    # Cast explicitly since the foreign table column types are derived from SQLite's declared types
+    preparer = postgresql_engine.dialect.identifier_preparer
+    column_list = ', '.join(preparer.quote(col) for col in insert_columns)
+    select_list = ', '.join(
+        f"CAST({preparer.quote(col)} AS {postgresql_table.c[col].type.compile(dialect=postgresql_engine.dialect)})"
+        for col in insert_columns
+    )
+
+    with postgresql_engine.begin() as conn:
+        configure_load_transaction(conn, disable_constraints)
+        result = conn.execute(text(
+            f"INSERT INTO {preparer.format_table(postgresql_table)} ({column_list}) "
+            f"SELECT {select_list} FROM {fdw_schema}.{preparer.quote(table_name)}"
+        ))
+
+    logger.info(f"✅ Successfully migrated {result.rowcount:,} rows from {table_name} (sqlite_fdw)")
+    return result.rowcount
+
+
+def migrate_table_data(sqlite_engine, postgresql_engine, sqlite_metadata: MetaData, postgresql_metadata: MetaData,
+                       table_name: str, batch_size: int, copy_chunk_size: int, commit_size: Optional[int],
+                       disable_constraints: bool, logger: logging.Logger) -> int:
     """Migrate data for a specific table in batches."""
+    committed_rows = 0
     try:
         # Check if table exists in both databases
-        sqlite_inspector = inspect(sqlite_engine)
-        postgresql_inspector = inspect(postgresql_engine)
+        sqlite_table = sqlite_metadata.tables.get(table_name)
+        postgresql_table = postgresql_metadata.tables.get(table_name)
 
-        if table_name not in sqlite_inspector.get_table_names():
+        if sqlite_table is None:
             logger.warning(f"⚠️  Table {table_name} not found in SQLite")
             return 0
 
-        if table_name not in postgresql_inspector.get_table_names():
+        if postgresql_table is None:
             logger.warning(f"⚠️  Table {table_name} not found in PostgreSQL")
             return 0
 
-        # Get table structure
-        sqlite_columns = sqlite_inspector.get_columns(table_name)
-        postgresql_columns = postgresql_inspector.get_columns(table_name)
-
-        # Map columns that exist in both databases
-        sqlite_col_names = [col['name'] for col in sqlite_columns]
-        postgresql_col_names = [col['name'] for col in postgresql_columns]
-        common_columns = [col for col in sqlite_col_names if col in postgresql_col_names]
-
-        if not common_columns:
+        insert_columns = get_insert_columns(sqlite_table, postgresql_table)
+        if not insert_columns:
             logger.warning(f"⚠️  No common columns found for table {table_name}")
             return 0
 
-        logger.info(f"📝 Migrating columns: {common_columns}")
-
-        # Count total rows in SQLite
-        with sqlite_engine.connect() as sqlite_conn:
-            count_result = sqlite_conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-            total_rows = count_result.scalar()
+        logger.info(f"📝 Migrating columns: {insert_columns}")
 
-        if total_rows == 0:
-            logger.info(f"📋 Table {table_name} is empty")
-            return 0
-
-        logger.info(f"🔄 Migrating {total_rows:,} rows from {table_name}")
+        # Rows are counted while streaming rather than with an up-front COUNT(*) scan
+        logger.info(f"🔄 Migrating rows from {table_name}")
 
         # Migrate data in batches
         migrated_rows = 0
-        offset = 0
 
-        # Prepare PostgreSQL insert statement (exclude ID for auto-generation)
-        insert_columns = [col for col in common_columns if col.lower() != 'id']
-        if not insert_columns:
-            insert_columns = common_columns  # Fallback if no non-ID columns
-
-        # Quote reserved keywords in column names for INSERT statement
-        quoted_insert_columns = [f'"{col}"' if col.lower() in ['group', 'order', 'select', 'from', 'where'] else col for col in insert_columns]
-        column_list = ', '.join(quoted_insert_columns)
-        placeholders = ', '.join([f':{col}' for col in insert_columns])
-        insert_sql = f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
-
-        while offset < total_rows:
-            # Read batch from SQLite
-            with sqlite_engine.connect() as sqlite_conn:
-                # Quote column names to handle reserved keywords like 'group'
-                quoted_columns = [f'"{col}"' if col.lower() in ['group', 'order', 'select', 'from', 'where'] else col for col in insert_columns if col.lower() != 'id']
-                if not quoted_columns:  # If only ID column, select all common columns
-                    quoted_columns = [f'"{col}"' if col.lower() in ['group', 'order', 'select', 'from', 'where'] else col for col in common_columns]
-                select_column_list = ', '.join(quoted_columns)
-                select_sql = f"SELECT {select_column_list} FROM {table_name} LIMIT {batch_size} OFFSET {offset}"
-                result = sqlite_conn.execute(text(select_sql))
-                rows = result.fetchall()
-
-                if not rows:
-                    break
+        # Let each dialect quote identifiers, which covers every reserved word (e.g. 'group')
+        sqlite_preparer = sqlite_engine.dialect.identifier_preparer
+        postgresql_preparer = postgresql_engine.dialect.identifier_preparer
+        column_list = ', '.join(postgresql_preparer.quote(col) for col in insert_columns)
+        postgresql_table_name = postgresql_preparer.format_table(postgresql_table)
+        use_copy = True
+
+        # Server-side prepared INSERT used only if COPY fails
+        insert_statement = postgresql_preparer.quote(f"migrate_insert_{table_name}")
+        insert_prepared = False
+
+        select_column_list = ', '.join(sqlite_preparer.quote(col) for col in insert_columns)
+        select_sql = f"SELECT {select_column_list} FROM {sqlite_preparer.format_table(sqlite_table)}"
+
+        # Read the table with a single streaming cursor so SQLite scans it only once, and load
+        # it over one PostgreSQL connection, committing every commit_size rows or once at the end
+        with sqlite_engine.connect() as sqlite_conn, postgresql_engine.connect() as postgresql_conn:
+            configure_load_transaction(postgresql_conn, disable_constraints)
+
+            # Read through the raw sqlite3 cursor; its plain tuples go straight to COPY
+            # without building SQLAlchemy Row objects
+            sqlite_cursor = sqlite_conn.connection.cursor()
+            sqlite_cursor.arraysize = batch_size
+            sqlite_cursor.execute(select_sql)
+
+            # Read the next chunk from SQLite while the current one is being written to PostgreSQL
+            for rows in prefetch(chunk_rows(fetch_batches(sqlite_cursor, batch_size), copy_chunk_size)):
+                # Load batch into PostgreSQL with COPY, which avoids per-row parse/plan overhead
+                if use_copy:
+                    savepoint = postgresql_conn.begin_nested()
+                    try:
+                        with postgresql_conn.connection.cursor() as cursor:
+                            copy_rows_to_postgresql(cursor, postgresql_table_name, column_list, rows)
+                        savepoint.commit()
+                    except Exception as e:
+                        savepoint.rollback()
+                        logger.warning(f"⚠️  COPY failed for {table_name}, falling back to INSERT: {e}")
+                        use_copy = False
+
+                if not use_copy:
+                    # Insert batch into PostgreSQL through the prepared statement
+                    with postgresql_conn.connection.cursor() as cursor:
+                        if not insert_prepared:
+                            prepare_insert_statement(cursor, insert_statement, postgresql_table_name,
+                                                     column_list, len(insert_columns))
+                            insert_prepared = True
+                        insert_rows_to_postgresql(cursor, insert_statement, len(insert_columns), rows, batch_size)
+
+                migrated_rows += len(rows)
 
-                # Convert rows to dictionaries, excluding auto-increment ID columns
-                batch_data = []
-                actual_select_columns = [col.strip('"') for col in quoted_columns]  # Remove quotes for mapping
-                for row in rows:
-                    row_dict = {}
-                    for i, col in enumerate(actual_select_columns):
-                        # Get value by index since we know the column order
-                        row_dict[col] = row[i]
-                    batch_data.append(row_dict)
-
-                # Don't regenerate insert_sql - it's already properly formatted with quoted columns above
-
-                # Insert batch into PostgreSQL
-                with postgresql_engine.connect() as postgresql_conn:
-                    postgresql_conn.execute(text(insert_sql), batch_data)
+                if commit_size and migrated_rows - committed_rows >= commit_size:
                     postgresql_conn.commit()
+                    committed_rows = migrated_rows
+                    configure_load_transaction(postgresql_conn, disable_constraints)
 
-                migrated_rows += len(rows)
-                offset += batch_size
+                # Progress reporting, once per PROGRESS_LOG_INTERVAL rows however small the chunks are
+                if migrated_rows // PROGRESS_LOG_INTERVAL > (migrated_rows - len(rows)) // PROGRESS_LOG_INTERVAL:
+                    logger.info(f"    📊 Progress: {migrated_rows:,} rows from {table_name}")
 
-                # Progress reporting
-                progress_pct = (migrated_rows / total_rows) * 100
-                logger.info(f"    📊 Progress: {migrated_rows:,}/{total_rows:,} rows ({progress_pct:.1f}%)")
+            sqlite_cursor.close()
+            if insert_prepared:
+                postgresql_conn.exec_driver_sql(f"DEALLOCATE {insert_statement}")
+            postgresql_conn.commit()
 
-        logger.info(f"✅ Successfully migrated {migrated_rows:,} rows from {table_name}")
+        if migrated_rows == 0:
+            logger.info(f"📋 Table {table_name} is empty")
+        else:
+            logger.info(f"✅ Successfully migrated {migrated_rows:,} rows from {table_name}")
         return migrated_rows
 
     except Exception as e:
         logger.error(f"❌ Failed to migrate table {table_name}: {e}")
+        if committed_rows:
+            logger.error(f"  ⚠️  The first {committed_rows:,} rows of {table_name} were already committed")
         raise
 
 
-def perform_data_migration(sqlite_engine, postgresql_engine, batch_size: int, logger: logging.Logger) -> bool:
-    """Perform the complete data migration process."""
+def perform_data_migration(sqlite_engine, postgresql_engine, sqlite_metadata: MetaData, postgresql_metadata: MetaData,
+                           batch_size: int, copy_chunk_size: int, commit_size: Optional[int], unlogged: bool,
+                           use_fdw: bool, workers: int, logger: logging.Logger) -> Optional[Dict[str, int]]:
+    """Perform the complete data migration process.
+
+    Returns the number of rows loaded into each table, or None if the migration failed.
+    """
     try:
 
         # Get tables in dependency order
-        tables_to_migrate = get_table_dependencies(sqlite_engine, logger)
+        tables_to_migrate = get_table_dependencies(sqlite_metadata, logger)
         if not tables_to_migrate:
             logger.error("❌ No tables found to migrate")
-            return False
+            return None
 
-        # Clear any existing data from tables (in case clearing didn't work completely)
-        logger.info("🧹 Ensuring all tables are empty...")
-        with postgresql_engine.connect() as conn:
-            tables = get_table_dependencies(postgresql_engine, logger)
-            for table_name in tables:
-                if table_name != 'alembic_version':  # Don't truncate alembic_version
+        # Disable constraints in the load transactions for faster migration
+        disable_constraints = disable_postgresql_constraints(postgresql_engine, logger)
+
+        # Optionally skip WAL writes for the bulk load; tables are made durable again afterwards
+        load_tables = [t for t in tables_to_migrate if t != 'alembic_version' and t in postgresql_metadata.tables]
+        unlogged = unlogged and set_postgresql_tables_logged(postgresql_engine, load_tables, False, logger)
+
+        # Drop secondary indexes so they are built once after the load instead of row by row
+        dropped_indexes = drop_postgresql_indexes(postgresql_engine, load_tables, logger)
+
+        fdw_schema = None
+        loaded_rows = {}
+        successful_tables = 0
+        failed_tables = []
+
+        def migrate_one_table(i: int, table_name: str) -> int:
+            logger.info(f"📋 Processing table {i}/{len(tables_to_migrate)}: {table_name}")
+            if fdw_schema:
+                return migrate_table_data_with_fdw(postgresql_engine, sqlite_metadata, postgresql_metadata,
+                                                   fdw_schema, table_name, disable_constraints, logger)
+            return migrate_table_data(sqlite_engine, postgresql_engine, sqlite_metadata, postgresql_metadata,
+                                      table_name, batch_size, copy_chunk_size, commit_size, disable_constraints,
+                                      logger)
+
+        try:
+            # Optionally let PostgreSQL read the SQLite file directly so rows never pass through Python
+            if use_fdw:
+                fdw_schema = setup_sqlite_fdw(postgresql_engine, sqlite_engine.url.database, logger)
+
+            # Migrate tables concurrently; each worker uses its own SQLite and PostgreSQL
+            # connections from the engine pools
+            data_tables = [(i, t) for i, t in enumerate(tables_to_migrate, 1) if t != 'alembic_version']
+            max_workers = max(1, min(workers, len(data_tables)))
+
+            # With foreign keys enforced, a child table can only be loaded once its parent's rows are
+            # committed, so load one table at a time with parents first. A single worker runs the
+            # tables in submission order
+            if not disable_constraints and any(t.foreign_keys for t in postgresql_metadata.tables.values()):
+                table_order = {t.name: position for position, t in enumerate(postgresql_metadata.sorted_tables)}
+                data_tables.sort(key=lambda item: table_order.get(item[1], len(table_order)))
+                max_workers = 1
+                logger.info("🔗 Foreign keys are enforced, migrating tables one at a time in dependency order")
+
+            logger.info(f"🔀 Migrating {len(data_tables)} tables with {max_workers} workers")
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(migrate_one_table, i, t): t for i, t in data_tables}
+                for future in as_completed(futures):
+                    table_name = futures[future]
                     try:
-                        conn.execute(text(f"TRUNCATE TABLE {table_name} RESTART IDENTITY CASCADE"))
-                        logger.info(f"  🗑️  Cleared {table_name}")
+                        loaded_rows[table_name] = future.result()
+                        successful_tables += 1
+
                     except Exception as e:
-                        logger.warning(f"  ⚠️  Could not clear {table_name}: {e}")
-            conn.commit()
+                        logger.error(f"❌ Failed to migrate table {table_name}: {e}")
+                        failed_tables.append(table_name)
 
-        # Temporarily disable constraints for faster migration
-        disable_postgresql_constraints(postgresql_engine, logger)
+            # Skip alembic_version table - Alembic manages this
+            if 'alembic_version' in tables_to_migrate:
+                logger.info("  ⏭️  Skipping alembic_version - managed by Alembic")
+                successful_tables += 1
 
-        try:
-            total_migrated = 0
-            successful_tables = 0
-            failed_tables = []
+        finally:
+            if fdw_schema:
+                teardown_sqlite_fdw(postgresql_engine, logger)
 
-            # Migrate each table
-            for i, table_name in enumerate(tables_to_migrate, 1):
-                logger.info(f"📋 Processing table {i}/{len(tables_to_migrate)}: {table_name}")
-
-                # Skip alembic_version table - Alembic manages this
-                if table_name == 'alembic_version':
-                    logger.info(f"  ⏭️  Skipping {table_name} - managed by Alembic")
-                    successful_tables += 1
-                    continue
-
-                try:
-                    rows_migrated = migrate_table_data(sqlite_engine, postgresql_engine, table_name, batch_size, logger)
-                    total_migrated += rows_migrated
-                    successful_tables += 1
-
-                except Exception as e:
-                    logger.error(f"❌ Failed to migrate table {table_name}: {e}")
-                    failed_tables.append(table_name)
-                    continue
-
-            # Migration summary
-            logger.info("=" * 60)
-            logger.info("📊 MIGRATION SUMMARY")
-            logger.info("=" * 60)
-            logger.info(f"✅ Successfully migrated tables: {successful_tables}/{len(tables_to_migrate)}")
-            logger.info(f"📈 Total rows migrated: {total_migrated:,}")
+            # Always rebuild dropped indexes and make the tables durable again
+            indexes_restored = restore_postgresql_indexes(postgresql_engine, dropped_indexes, logger)
+            logged_restored = not unlogged or set_postgresql_tables_logged(postgresql_engine, load_tables, True, logger)
 
-            if failed_tables:
-                logger.warning(f"⚠️  Failed tables: {failed_tables}")
+        # Migration summary
+        logger.info("=" * 60)
+        logger.info("📊 MIGRATION SUMMARY")
+        logger.info("=" * 60)
+        logger.info(f"✅ Successfully migrated tables: {successful_tables}/{len(tables_to_migrate)}")
+        logger.info(f"📈 Total rows migrated: {sum(loaded_rows.values()):,}")
 
-            return len(failed_tables) == 0
+        if failed_tables:
+            logger.warning(f"⚠️  Failed tables: {failed_tables}")
 
-        finally:
-            # Always re-enable constraints
-            enable_postgresql_constraints(postgresql_engine, logger)
+        if failed_tables or not indexes_restored or not logged_restored:
+            return None
+        return loaded_rows
 
     except Exception as e:
         logger.error(f"❌ Data migration failed: {e}")
-        return False
+        return None
 
 
 def update_postgresql_sequences(postgresql_engine, logger: logging.Logger) -> bool:
@@ -674,139 +1007,137 @@ def update_postgresql_sequences(postgresql_engine, logger: logging.Logger) -> bo
     try:
         logger.info("🔄 Updating PostgreSQL sequence values...")
 
-        # Get all sequences (handle different PostgreSQL versions)
-        sequences = []
+        with postgresql_engine.begin() as conn:
+            # Find every sequence owned by a table column (serial and identity columns) in one query
+            sequences = conn.execute(text("""
+                SELECT t.relname AS tablename, a.attname AS columnname, s.relname AS sequencename
+                FROM pg_class s
+                JOIN pg_namespace n ON n.oid = s.relnamespace
+                JOIN pg_depend d ON d.objid = s.oid
+                    AND d.classid = 'pg_class'::regclass
+                    AND d.refclassid = 'pg_class'::regclass
+                JOIN pg_class t ON t.oid = d.refobjid
+                JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = d.refobjsubid
+                WHERE s.relkind = 'S'
+                AND n.nspname = 'public'
+            """)).fetchall()
+
+            if not sequences:
+                logger.info("📋 No sequences found to update")
+                return True
+
+            # Move every sequence past its column's current maximum with a single statement,
+            # so the next generated value is MAX + 1 (or 1 for an empty table)
+            quote = postgresql_engine.dialect.identifier_preparer.quote
+            selects = []
+            params = {}
+            for i, seq in enumerate(sequences):
+                params[f"seq_{i}"] = quote(seq.sequencename)
+                selects.append(
+                    f"SELECT CAST(:seq_{i} AS text) AS sequencename, "
+                    f"setval(CAST(:seq_{i} AS regclass), "
+                    f"COALESCE((SELECT MAX({quote(seq.columnname)}) FROM {quote(seq.tablename)}), 0) + 1, false) AS next_value"
+                )
+            results = conn.execute(text(" UNION ALL ".join(selects)), params).fetchall()
+
+        for result in results:
+            if result.next_value > 1:
+                logger.info(f"  📈 Updated sequence {result.sequencename} to {result.next_value}")
+            else:
+                logger.debug(f"  📋 Sequence {result.sequencename} reset to 1 (table empty)")
+
+        logger.info("✅ PostgreSQL sequences updated")
+        return True
 
-        # Try modern PostgreSQL (10+) first
+    except Exception as e:
+        logger.error(f"❌ Failed to update PostgreSQL sequences: {e}")
+        return False
+
+
+def count_table_rows(engine, table_names: List[str], logger: logging.Logger) -> Dict[str, Optional[int]]:
+    """Count the rows of several tables, falling back to one query per table if the combined query fails."""
+    if not table_names:
+        return {}
+
+    quote = engine.dialect.identifier_preparer.quote
+    counts = {}
+    with engine.connect() as conn:
+        # Count every table in a single round-trip
         try:
-            with postgresql_engine.connect() as conn:
-                sequences_query = text("""
-                    SELECT schemaname, tablename, columnname, sequencename
-                    FROM pg_sequences
-                    WHERE schemaname = 'public'
-                """)
-                sequences = conn.execute(sequences_query).fetchall()
-                logger.debug("Using pg_sequences for PostgreSQL 10+")
+            selects = []
+            params = {}
+            for i, table_name in enumerate(table_names):
+                params[f"table_{i}"] = table_name
+                selects.append(f"SELECT :table_{i} AS table_name, COUNT(*) AS row_count FROM {quote(table_name)}")
+            result = conn.execute(text(" UNION ALL ".join(selects)), params)
+            return {row.table_name: row.row_count for row in result}
         except Exception as e:
-            logger.debug(f"pg_sequences query failed: {e}, trying fallback")
+            logger.debug(f"Combined row count failed, counting tables individually: {e}")
+            conn.rollback()
 
-            # Fallback for older PostgreSQL versions - use a new connection
+        for table_name in table_names:
             try:
-                with postgresql_engine.connect() as conn:
-                    sequences_query = text("""
-                        SELECT 'public' as schemaname,
-                               CASE
-                                   WHEN c.relname LIKE '%_id_seq' THEN substr(c.relname, 1, length(c.relname) - 7)
-                                   WHEN c.relname LIKE '%_seq' THEN substr(c.relname, 1, length(c.relname) - 4)
-                                   ELSE substr(c.relname, 1, length(c.relname) - 3)
-                               END as tablename,
-                               'id' as columnname,
-                               c.relname as sequencename
-                        FROM pg_class c
-                        WHERE c.relkind = 'S'
-                        AND c.relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = 'public')
-                    """)
-                    sequences = conn.execute(sequences_query).fetchall()
-                    logger.debug("Using pg_class fallback for older PostgreSQL")
-            except Exception as fallback_e:
-                logger.error(f"Both sequence queries failed: {fallback_e}")
-                return False
-
-        if not sequences:
-            logger.info("📋 No sequences found to update")
-            return True
-
-        # Get list of existing tables to avoid updating sequences for non-existent tables
-        existing_tables = set()
-        try:
-            with postgresql_engine.connect() as conn:
-                inspector = inspect(postgresql_engine)
-                existing_tables = set(inspector.get_table_names())
-        except Exception as e:
-            logger.warning(f"Could not get table list: {e}")
+                counts[table_name] = conn.execute(text(f"SELECT COUNT(*) FROM {quote(table_name)}")).scalar()
+            except Exception as e:
+                logger.error(f"  ❌ Could not count rows in {table_name}: {e}")
+                counts[table_name] = None
+                conn.rollback()
 
-        # Update each sequence with individual transactions to avoid aborted transaction issues
-        for seq in sequences:
-            table_name = seq.tablename
-            column_name = seq.columnname
-            sequence_name = seq.sequencename
+    return counts
 
-            # Skip sequences for tables that don't exist
-            if table_name not in existing_tables:
-                logger.debug(f"  ⏭️  Skipping sequence {sequence_name} - table {table_name} does not exist")
-                continue
 
-            try:
-                # Use a fresh connection for each sequence to avoid transaction state issues
-                with postgresql_engine.connect() as conn:
-                    # Get the maximum value from the table
-                    max_query = text(f"SELECT COALESCE(MAX({column_name}), 0) FROM {table_name}")
-                    max_val = conn.execute(max_query).scalar()
-
-                    if max_val > 0:
-                        # Set sequence to max_val + 1
-                        set_seq_query = text(f"SELECT setval('{sequence_name}', {max_val + 1})")
-                        conn.execute(set_seq_query)
-                        conn.commit()
-                        logger.info(f"  📈 Updated sequence {sequence_name} to {max_val + 1}")
-                    else:
-                        logger.debug(f"  📋 Sequence {sequence_name} already at correct value (table empty)")
+def collect_row_counts(sqlite_engine, postgresql_engine, sqlite_metadata: MetaData, postgresql_metadata: MetaData,
+                       loaded_rows: Dict[str, int], logger: logging.Logger) -> Optional[Dict[str, Any]]:
+    """Collect table names and row counts from both databases for validation and reporting.
 
-            except Exception as e:
-                logger.warning(f"  ⚠️  Could not update sequence {sequence_name}: {e}")
-                logger.debug(f"     Table: {table_name}, Column: {column_name}")
-                # Continue with other sequences even if one fails
+    Tables loaded by the migration take their PostgreSQL count from loaded_rows, the number of rows
+    committed by the loader, so only the remaining tables are counted in PostgreSQL.
+    """
+    try:
+        sqlite_tables = {t for t in sqlite_metadata.tables if not t.startswith('sqlite_')}
+        postgresql_tables = {t for t in postgresql_metadata.tables if not t.startswith('sqlite_')}
+        common_tables = sorted(sqlite_tables.intersection(postgresql_tables))
 
-        logger.info("✅ PostgreSQL sequences updated")
-        return True
+        sqlite_counts = count_table_rows(sqlite_engine, common_tables, logger)
+        postgresql_counts = count_table_rows(postgresql_engine, [t for t in common_tables if t not in loaded_rows], logger)
+        postgresql_counts.update(loaded_rows)
+
+        return {
+            'sqlite_tables': sqlite_tables,
+            'postgresql_tables': postgresql_tables,
+            'counts': {t: (sqlite_counts.get(t), postgresql_counts.get(t)) for t in common_tables},
+        }
 
     except Exception as e:
-        logger.error(f"❌ Failed to update PostgreSQL sequences: {e}")
-        return False
+        logger.error(f"❌ Failed to collect row counts: {e}")
+        return None
 
 
-def validate_data_integrity(sqlite_engine, postgresql_engine, logger: logging.Logger) -> bool:
-    """Validate data integrity by comparing row counts and sample data."""
+def validate_data_integrity(row_counts: Dict[str, Any], logger: logging.Logger) -> bool:
+    """Validate data integrity by comparing row counts."""
     try:
         logger.info("🔍 Validating data integrity...")
 
-        # Get common tables
-        sqlite_inspector = inspect(sqlite_engine)
-        postgresql_inspector = inspect(postgresql_engine)
-
-        sqlite_tables = set(sqlite_inspector.get_table_names())
-        postgresql_tables = set(postgresql_inspector.get_table_names())
-
-        common_tables = sqlite_tables.intersection(postgresql_tables)
-        common_tables = [t for t in common_tables if not t.startswith('sqlite_')]
-
         validation_results = {}
         all_valid = True
 
-        for table_name in common_tables:
-            try:
-                # Compare row counts
-                with sqlite_engine.connect() as sqlite_conn:
-                    sqlite_count = sqlite_conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
-
-                with postgresql_engine.connect() as postgresql_conn:
-                    postgresql_count = postgresql_conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+        for table_name, (sqlite_count, postgresql_count) in row_counts['counts'].items():
+            if sqlite_count is None or postgresql_count is None:
+                logger.error(f"  ❌ Could not validate {table_name}")
+                validation_results[table_name] = {'error': True}
+                all_valid = False
+                continue
 
-                validation_results[table_name] = {
-                    'sqlite_count': sqlite_count,
-                    'postgresql_count': postgresql_count,
-                    'match': sqlite_count == postgresql_count
-                }
+            validation_results[table_name] = {
+                'sqlite_count': sqlite_count,
+                'postgresql_count': postgresql_count,
+                'match': sqlite_count == postgresql_count
+            }
 
-                if sqlite_count == postgresql_count:
-                    logger.info(f"  ✅ {table_name}: {sqlite_count:,} rows (match)")
-                else:
-                    logger.error(f"  ❌ {table_name}: SQLite={sqlite_count:,}, PostgreSQL={postgresql_count:,} (mismatch)")
-                    all_valid = False
-
-            except Exception as e:
-                logger.error(f"  ❌ Could not validate {table_name}: {e}")
-                validation_results[table_name] = {'error': str(e)}
+            if sqlite_count == postgresql_count:
+                logger.info(f"  ✅ {table_name}: {sqlite_count:,} rows (match)")
+            else:
+                logger.error(f"  ❌ {table_name}: SQLite={sqlite_count:,}, PostgreSQL={postgresql_count:,} (mismatch)")
                 all_valid = False
 
         # Summary with details of failed tables
@@ -836,7 +1167,7 @@ def validate_data_integrity(sqlite_engine, postgresql_engine, logger: logging.Lo
         return False
 
 
-def generate_migration_report(sqlite_engine, postgresql_engine, logger: logging.Logger):
+def generate_migration_report(sqlite_engine, postgresql_engine, row_counts: Dict[str, Any], logger: logging.Logger):
     """Generate a comprehensive migration summary report."""
     try:
         logger.info("📋 Generating migration report...")
@@ -850,23 +1181,15 @@ def generate_migration_report(sqlite_engine, postgresql_engine, logger: logging.
         print()
 
         # Table summary
-        sqlite_inspector = inspect(sqlite_engine)
-        postgresql_inspector = inspect(postgresql_engine)
-
-        sqlite_tables = set(sqlite_inspector.get_table_names())
-        postgresql_tables = set(postgresql_inspector.get_table_names())
-
-        # Filter out system tables for analysis
-        sqlite_user_tables = {t for t in sqlite_tables if not t.startswith('sqlite_')}
-        postgresql_user_tables = {t for t in postgresql_tables if not t.startswith('sqlite_')}
+        sqlite_user_tables = row_counts['sqlite_tables']
+        postgresql_user_tables = row_counts['postgresql_tables']
 
         missing_in_postgresql = sqlite_user_tables - postgresql_user_tables
         extra_in_postgresql = postgresql_user_tables - sqlite_user_tables
-        common_tables = sqlite_user_tables.intersection(postgresql_user_tables)
 
         print(f"SQLite tables found: {len(sqlite_user_tables)}")
         print(f"PostgreSQL tables found: {len(postgresql_user_tables)}")
-        print(f"Common tables: {len(common_tables)}")
+        print(f"Common tables: {len(row_counts['counts'])}")
 
         # Show missing tables if any
         if missing_in_postgresql:
@@ -878,19 +1201,13 @@ def generate_migration_report(sqlite_engine, postgresql_engine, logger: logging.
         # Row count summary
         print("Table Row Counts:")
         print("-" * 50)
-        for table_name in sorted(common_tables):
-            try:
-                with sqlite_engine.connect() as sqlite_conn:
-                    sqlite_count = sqlite_conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
-
-                with postgresql_engine.connect() as postgresql_conn:
-                    postgresql_count = postgresql_conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
-
-                status = "✅" if sqlite_count == postgresql_count else "❌"
-                print(f"{status} {table_name:<25} {sqlite_count:>10,} → {postgresql_count:>10,}")
-
-            except Exception as e:
+        for table_name, (sqlite_count, postgresql_count) in row_counts['counts'].items():
+            if sqlite_count is None or postgresql_count is None:
                 print(f"❌ {table_name:<25} {'Error':>10} → {'Error':>10}")
+                continue
+
+            status = "✅" if sqlite_count == postgresql_count else "❌"
+            print(f"{status} {table_name:<25} {sqlite_count:>10,} → {postgresql_count:>10,}")
 
         print("=" * 80)
 
@@ -898,7 +1215,8 @@ def generate_migration_report(sqlite_engine, postgresql_engine, logger: logging.
         logger.error(f"❌ Failed to generate migration report: {e}")
 
 
-def post_migration_tasks(sqlite_engine, postgresql_engine, logger: logging.Logger) -> bool:
+def post_migration_tasks(sqlite_engine, postgresql_engine, sqlite_metadata: MetaData, postgresql_metadata: MetaData,
+                         loaded_rows: Dict[str, int], logger: logging.Logger) -> bool:
     """Perform post-migration tasks including validation and reporting."""
     try:
         success = True
@@ -907,12 +1225,18 @@ def post_migration_tasks(sqlite_engine, postgresql_engine, logger: logging.Logge
         if not update_postgresql_sequences(postgresql_engine, logger):
             logger.warning("⚠️  Sequence update failed, but this doesn't affect data integrity")
 
+        # Count rows once and share the results between validation and the report
+        row_counts = collect_row_counts(sqlite_engine, postgresql_engine, sqlite_metadata, postgresql_metadata,
+                                        loaded_rows, logger)
+        if row_counts is None:
+            return False
+
         # Validate data integrity (this is critical)
-        if not validate_data_integrity(sqlite_engine, postgresql_engine, logger):
+        if not validate_data_integrity(row_counts, logger):
             success = False
 
         # Generate migration report
-        generate_migration_report(sqlite_engine, postgresql_engine, logger)
+        generate_migration_report(sqlite_engine, postgresql_engine, row_counts, logger)
         sys.stdout.flush()  # Ensure report is displayed immediately
 
         return success
@@ -925,18 +1249,32 @@ def post_migration_tasks(sqlite_engine, postgresql_engine, logger: logging.Logge
 def main():
     """Main entry point."""
     args = parse_arguments()
+    load_dependencies()
     logger = setup_logging(args.verbose)
 
     logger.info("Starting SQLite to PostgreSQL migration")
     logger.info(f"SQLite URL: {args.sqlite_url}")
     logger.info(f"PostgreSQL URL: {args.postgresql_url.split('@')[0]}@***")  # Hide credentials
     logger.info(f"Batch size: {args.batch_size}")
+    logger.info(f"COPY chunk size: {args.copy_chunk_size}")
+    logger.info(f"Commit size: {args.commit_size or 'one transaction per table'}")
+    logger.info(f"Workers: {args.workers}")
 
     # Step 1: Create database engines
     logger.info("🔗 Creating database connections...")
     try:
-        sqlite_engine = create_engine(args.sqlite_url, echo=False)
-        postgresql_engine = create_engine(args.postgresql_url, echo=False)
+        # Size the pools so every migration worker can hold its own connection, without letting
+        # overflow connections pile up; check connections before reuse since a large migration
+        # can keep idle connections around long enough for the server to drop them
+        pool_options = {
+            'pool_size': max(5, args.workers),
+            'max_overflow': 0,
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,
+        }
+        sqlite_engine = create_engine(args.sqlite_url, echo=False, **pool_options)
+        tune_sqlite_engine(sqlite_engine)
+        postgresql_engine = create_engine(args.postgresql_url, echo=False, **pool_options)
     except Exception as e:
         logger.error(f"❌ Failed to create database engines: {e}")
         sys.exit(1)
@@ -976,33 +1314,29 @@ def main():
     if not apply_alembic_migrations(alembic_cfg, args.postgresql_url, logger):
         sys.exit(1)
 
-    # Completely reinitialize logging system after Alembic interference
-    importlib.reload(logging)
-
-    # Clear all existing loggers and handlers
-    for handler in logging.root.handlers[:]:
-        logging.root.removeHandler(handler)
-    logging.root.handlers.clear()
-
-    # Reset all loggers
-    for name in list(logging.Logger.manager.loggerDict.keys()):
-        logging.Logger.manager.loggerDict[name].handlers.clear()
-
-    # Create completely fresh logger
-    logger = setup_logging(args.verbose)
-    logger.info("🔧 Logger restored after Alembic execution")
+    # Reflect both schemas once and share them with the verification, data migration and validation steps
+    try:
+        sqlite_metadata = MetaData()
+        sqlite_metadata.reflect(bind=sqlite_engine)
+        postgresql_metadata = MetaData()
+        postgresql_metadata.reflect(bind=postgresql_engine)
+    except Exception as e:
+        logger.error(f"❌ Failed to read database schemas: {e}")
+        sys.exit(1)
 
     # Step 7: Verify schema was created
     logger.info("🔍 Verifying schema creation...")
-    if not verify_schema_creation(postgresql_engine, logger):
+    if not verify_schema_creation(postgresql_engine, postgresql_metadata, logger):
         logger.error("❌ Schema verification failed - no tables found after Alembic migration")
         sys.exit(1)
 
     # Step 8: Perform data migration
     logger.info("🚀 Starting data migration...")
-    migration_result = perform_data_migration(sqlite_engine, postgresql_engine, args.batch_size, logger)
+    loaded_rows = perform_data_migration(sqlite_engine, postgresql_engine, sqlite_metadata, postgresql_metadata,
+                                         args.batch_size, args.copy_chunk_size, args.commit_size, args.unlogged,
+                                         args.use_fdw, args.workers, logger)
 
-    if not migration_result:
+    if loaded_rows is None:
         logger.error("❌ Data migration failed")
         sys.exit(1)
 
@@ -1010,7 +1344,8 @@ def main():
 
     # Step 9: Post-migration tasks
     logger.info("🔍 Running post-migration validation...")
-    if not post_migration_tasks(sqlite_engine, postgresql_engine, logger):
+    if not post_migration_tasks(sqlite_engine, postgresql_engine, sqlite_metadata, postgresql_metadata,
+                                loaded_rows, logger):
         sys.exit(1)
 
     logger.info("🎉 Migration completed successfully!")
@@ -7,6 +7,7 @@ import pytest
 import pandas as pd
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fileglancer_central.database import *
 from fileglancer_central.utils import slugify_path
 
@@ -34,24 +35,23 @@ def temp_dir():
 
 
 @pytest.fixture
-def db_session(temp_dir):
+def db_session():
     """Create a test database session"""
 
-    # Create temp directory for test database
-    db_path = os.path.join(temp_dir, "test.db")
-
-    engine = create_engine(f"sqlite:///{db_path}")
+    # Use an in-memory database; StaticPool keeps the single connection it lives on
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     Session = sessionmaker(bind=engine)
     session = Session()
     Base.metadata.create_all(engine)
     yield session
 
-    # Clean up after each test
-    session.query(FileSharePathDB).delete()
-    session.query(LastRefreshDB).delete()
-    session.query(UserPreferenceDB).delete()
-    session.commit()
+    # The database is discarded along with its connection
     session.close()
+    engine.dispose()
 
 
 @pytest.fixture
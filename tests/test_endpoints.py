@@ -9,7 +9,7 @@ from fileglancer_central.settings import Settings
 from fileglancer_central.app import create_app
 from fileglancer_central.database import *
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def temp_dir():
     temp_dir = tempfile.mkdtemp()
     print(f"Created temp directory: {temp_dir}")
@@ -19,17 +19,23 @@ def temp_dir():
     shutil.rmtree(temp_dir)
 
 
-@pytest.fixture
-def test_app(temp_dir):
-    """Create test FastAPI app"""
-    
-    # Create temp directory for test database
+@pytest.fixture(scope="module")
+def db_url(temp_dir):
+    """Create the test database, shared by all tests in this module"""
     db_path = os.path.join(temp_dir, "test.db")
     db_url = f"sqlite:///{db_path}"
     engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return db_url
+
+
+@pytest.fixture(scope="module")
+def test_app(temp_dir, db_url):
+    """Create test FastAPI app"""
+    engine = create_engine(db_url)
     Session = sessionmaker(bind=engine)
     db_session = Session()
-    Base.metadata.create_all(engine)
 
     fsp = FileSharePathDB(
         name="tempdir", 
@@ -44,6 +50,8 @@ def test_app(temp_dir):
     db_session.add(fsp)
     db_session.commit()
     print(f"Created file share path {fsp.name} with mount path {fsp.mount_path}")
+    db_session.close()
+    engine.dispose()
 
     # Create directory for testing proxied paths
     test_proxied_path = os.path.join(temp_dir, "test_proxied_path")
@@ -56,12 +64,25 @@ def test_app(temp_dir):
     return app
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def test_client(test_app):
     """Create test client"""
     return TestClient(test_app)
 
 
+@pytest.fixture(autouse=True)
+def clean_user_data(db_url):
+    """Remove preferences and proxied paths created by the previous test"""
+    yield
+    engine = create_engine(db_url)
+    Session = sessionmaker(bind=engine)
+    with Session() as db_session:
+        db_session.query(UserPreferenceDB).delete()
+        db_session.query(ProxiedPathDB).delete()
+        db_session.commit()
+    engine.dispose()
+
+
 def test_docs_redirect(test_client):
     """Test redirect to docs page"""
     response = test_client.get("/")
@@ -0,0 +1,154 @@
+import csv
+import io
+import logging
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import migrate
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def dependencies():
+    """Bind the SQLAlchemy names migrate.py imports lazily"""
+    migrate.load_dependencies()
+
+
+class FakeCopyCursor:
+    """Records what copy_expert would send to PostgreSQL"""
+
+    def copy_expert(self, sql, file):
+        self.sql = sql
+        self.data = file.read()
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE a (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("CREATE TABLE b (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO a (id) VALUES (1), (2), (3)"))
+    yield engine
+    engine.dispose()
+
+
+def test_copy_rows_statement():
+    cursor = FakeCopyCursor()
+    migrate.copy_rows_to_postgresql(cursor, '"t"', '"id", "group"', [(1, "x")])
+    assert cursor.sql == 'COPY "t" ("id", "group") FROM STDIN WITH (FORMAT csv)'
+
+
+def test_copy_rows_null_and_empty_string():
+    cursor = FakeCopyCursor()
+    migrate.copy_rows_to_postgresql(cursor, "t", "a, b", [(None, ""), ("", None)])
+    # COPY reads an unquoted empty field as NULL and a quoted one as an empty string
+    assert cursor.data == ',""\n"",\n'
+
+
+def test_copy_rows_special_characters():
+    cursor = FakeCopyCursor()
+    rows = [
+        (1, 'say "hi"'),
+        (2, "line one\nline two"),
+        (3, "a,b"),
+        (4, "\\."),
+    ]
+    migrate.copy_rows_to_postgresql(cursor, "t", "id, value", rows)
+    assert cursor.data == (
+        '"1","say ""hi"""\n'
+        '"2","line one\nline two"\n'
+        '"3","a,b"\n'
+        # Quoted, so COPY does not mistake it for the end-of-data marker
+        '"4","\\."\n'
+    )
+    # The values survive a CSV round trip
+    parsed = list(csv.reader(io.StringIO(cursor.data)))
+    assert [row[1] for row in parsed] == [value for _, value in rows]
+
+
+def test_copy_rows_empty():
+    cursor = FakeCopyCursor()
+    migrate.copy_rows_to_postgresql(cursor, "t", "id", [])
+    assert cursor.data == ""
+
+
+def test_chunk_rows():
+    partitions = [[1, 2], [3], [4, 5, 6], [7]]
+    assert list(migrate.chunk_rows(partitions, 3)) == [[1, 2, 3], [4, 5, 6], [7]]
+
+
+def test_chunk_rows_exact_and_empty():
+    assert list(migrate.chunk_rows([[1, 2], [3, 4]], 2)) == [[1, 2], [3, 4]]
+    assert list(migrate.chunk_rows([], 2)) == []
+    assert list(migrate.chunk_rows([[]], 2)) == []
+
+
+def test_fetch_batches(sqlite_engine):
+    with sqlite_engine.connect() as conn:
+        cursor = conn.connection.cursor()
+        cursor.execute("SELECT id FROM a ORDER BY id")
+        assert list(migrate.fetch_batches(cursor, 2)) == [[(1,), (2,)], [(3,)]]
+        cursor.close()
+
+
+def test_count_table_rows(sqlite_engine):
+    counts = migrate.count_table_rows(sqlite_engine, ["a", "b"], logger)
+    assert counts == {"a": 3, "b": 0}
+
+
+def test_count_table_rows_no_tables(sqlite_engine):
+    assert migrate.count_table_rows(sqlite_engine, [], logger) == {}
+
+
+def test_count_table_rows_falls_back_per_table(sqlite_engine):
+    # The missing table fails the combined query; the others are still counted individually
+    counts = migrate.count_table_rows(sqlite_engine, ["a", "missing", "b"], logger)
+    assert counts == {"a": 3, "missing": None, "b": 0}
+
+
+def test_prefetch_yields_all_items_in_order():
+    assert list(migrate.prefetch(iter(range(10)), depth=2)) == list(range(10))
+
+
+def test_prefetch_reraises_producer_error():
+    def source():
+        yield 1
+        yield 2
+        raise ValueError("read failed")
+
+    consumed = []
+    with pytest.raises(ValueError, match="read failed"):
+        for item in migrate.prefetch(source()):
+            consumed.append(item)
+    # Items read before the failure are still delivered
+    assert consumed == [1, 2]
+
+
+def test_prefetch_stops_producer_when_consumer_stops_early():
+    produced = []
+
+    def source():
+        # Endless, so the producer only finishes if prefetch stops it
+        i = 0
+        while True:
+            produced.append(i)
+            yield i
+            i += 1
+
+    threads_before = set(threading.enumerate())
+    items = migrate.prefetch(source(), depth=1)
+    assert [next(items) for _ in range(3)] == [0, 1, 2]
+    items.close()
+
+    # The producer thread has been joined and did not keep reading ahead
+    assert set(threading.enumerate()) - threads_before == set()
+    assert len(produced) <= 3 + 2